@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 """
 img2text.py — View images as ASCII / Braille / Blocks in terminal (great for Vim).
-Pure Python (stdlib only). No external packages.
+Pure Python (stdlib only). No external packages required; if NumPy is
+installed it is used to vectorize the hot loops (Numba, if also present,
+compiles PNG unfiltering for very large images), and a system libdeflate
+(loaded via ctypes) speeds up PNG decompression. cykooz.resizer or Pillow,
+when installed, give a filtered downscale (--resample nearest opts out).
 
 Supported formats:
   - PNG: non-interlaced, color types 0/2/3/4/6, bit depths 1/2/4/8/16
@@ -15,6 +19,7 @@ Render modes:
 
 Color:
   --color enables 24-bit ANSI. Use --color-mode auto|fg|bg (default: auto).
+  --color256 uses the 256-color palette (6x6x6 cube) instead; shorter output.
 
 Sizing:
   - Use --width/--height to fit a window.
@@ -24,37 +29,231 @@ Sizing:
       braille:      width=ceil(w/2), height=ceil(h/4)
 """
 
-import sys, os, struct, zlib, shutil, argparse, math
+import sys, os, struct, zlib, shutil, argparse, math, mmap, array
 
-RESET = "\x1b[0m"
+try:
+    import numpy as np  # optional: vectorized fast paths
+except ImportError:
+    np = None
 
-def ansi_fg(r,g,b): return f"\x1b[38;2;{r};{g};{b}m"
-def ansi_bg(r,g,b): return f"\x1b[48;2;{r};{g};{b}m"
+# Output is assembled as UTF-8 bytes end to end and written to
+# sys.stdout.buffer, so escapes and glyphs are kept pre-encoded.
+RESET = b"\x1b[0m"
+FG_BLACK = b"\x1b[30m"; FG_WHITE = b"\x1b[97m"  # glyph contrast on painted bg
+DEC = [str(i).encode() for i in range(256)]  # channel value -> decimal text
 
-def luma(r,g,b):  # Rec.601
-    return int(0.299*r + 0.587*g + 0.114*b + 0.5)
+_FG_CACHE = {}; _BG_CACHE = {}  # packed 0xRRGGBB -> escape; neighbours repeat a lot
 
-def paint_cell(glyph, r, g, b, mode="auto", Y=None):
+def ansi_fg(r,g,b):
+    key = (r << 16) | (g << 8) | b
+    esc = _FG_CACHE.get(key)
+    if esc is None:
+        esc = _FG_CACHE[key] = b"\x1b[38;2;" + DEC[r] + b";" + DEC[g] + b";" + DEC[b] + b"m"
+    return esc
+
+def ansi_bg(r,g,b):
+    key = (r << 16) | (g << 8) | b
+    esc = _BG_CACHE.get(key)
+    if esc is None:
+        esc = _BG_CACHE[key] = b"\x1b[48;2;" + DEC[r] + b";" + DEC[g] + b";" + DEC[b] + b"m"
+    return esc
+
+# channel value -> nearest xterm cube level; the levels 0/95/135/175/215/255
+# are not evenly spaced, so a plain v*5/255 rounding would skew dark tones
+_CUBE_LEVEL = [0 if v < 48 else 1 if v < 115 else (v - 35) // 40 for v in range(256)]
+
+def cube_index(r,g,b):  # nearest entry of the xterm 6x6x6 color cube
+    return 16 + 36*_CUBE_LEVEL[r] + 6*_CUBE_LEVEL[g] + _CUBE_LEVEL[b]
+
+FG256 = [b"\x1b[38;5;" + DEC[i] + b"m" for i in range(256)]
+BG256 = [b"\x1b[48;5;" + DEC[i] + b"m" for i in range(256)]
+
+def ansi_fg256(r,g,b): return FG256[cube_index(r,g,b)]
+def ansi_bg256(r,g,b): return BG256[cube_index(r,g,b)]
+
+def luma(r,g,b):  # Rec.601, 8.8 fixed point (within 1 of the float weights)
+    return (77*r + 150*g + 29*b + 128) >> 8
+
+def ramp_lut(ramp_str, gamma_table=None):
+    """Encoded glyph for every luma value 0..255, optionally through gamma_lut."""
+    n = len(ramp_str) - 1
+    glyphs = [ramp_str[int((Y/255.0) * n + 0.5)].encode("utf-8") for Y in range(256)]
+    return glyphs if gamma_table is None else [glyphs[Y] for Y in gamma_table]
+
+def gamma_lut(gamma):
+    """Tone curve as a 256-entry table (Y -> corrected Y); None when linear."""
+    if gamma == 1.0: return None
+    return bytes(int((Y/255.0) ** gamma * 255 + 0.5) for Y in range(256))
+
+# NumPy counterparts of the per-pixel helpers; same math as above.
+_BLEND = None  # (alpha << 8 | channel) -> channel blended over white
+
+def _composite_np(arr):
+    """(..., 4) uint8 RGBA -> (..., 3) uint8 RGB blended over white."""
+    global _BLEND
+    if (arr[..., 3] == 255).all():  # opaque: blending is the identity
+        return arr[..., :3]
+    if _BLEND is None:  # the float formula over every (alpha, value) pair
+        ar = np.arange(256)[:, None] / 255.0
+        _BLEND = (ar * np.arange(256) + (1 - ar) * 255 + 0.5).astype(np.uint8).ravel()
+    return _BLEND[(arr[..., 3:4].astype(np.intp) << 8) | arr[..., :3]]
+
+def _luma_np(rgb):
+    c = rgb.astype(np.uint16)  # 77+150+29 = 256, so the sum stays below 2**16
+    return ((c[..., 0] * 77 + c[..., 1] * 150 + c[..., 2] * 29 + 128) >> 8).astype(np.uint8)
+
+def _gamma_np(Y, lut):
+    return Y if lut is None else np.frombuffer(lut, np.uint8)[Y]
+
+def _pixels_to_luma(arr, lut):
     """
+    Shared front half of the NumPy renderers: RGBA -> (RGB over white,
+    gamma-corrected luma), both uint8, without intermediate wide copies.
+    """
+    rgb = _composite_np(arr)
+    return rgb, _gamma_np(_luma_np(rgb), lut)
+
+def cell_style(r, g, b, mode="auto", Y=None, color256=False):
+    """
+    Escape that sets up one cell's colors, plus whether it paints the
+    background (a later fg-only cell then needs a RESET first).
     mode: 'fg'  - color the glyph only
           'bg'  - paint background; glyph in black/white for contrast
           'auto'- bg for bright, fg for dark, smart for mid
+    color256: emit 256-color palette escapes instead of 24-bit ones
     """
     if Y is None:
         Y = luma(r, g, b)
+    fg_esc, bg_esc = (ansi_fg256, ansi_bg256) if color256 else (ansi_fg, ansi_bg)
 
     if mode == "fg":
-        return f"{ansi_fg(r,g,b)}{glyph}{RESET}"
+        return fg_esc(r,g,b), False
     if mode == "bg":
-        fg = "30" if Y >= 150 else "97"  # black on bright, white on dark
-        return f"{ansi_bg(r,g,b)}\x1b[{fg}m{glyph}{RESET}"
+        fg = FG_BLACK if Y >= 150 else FG_WHITE  # black on bright, white on dark
+        return bg_esc(r,g,b) + fg, True
 
     # auto
     if Y >= 160:
-        return f"{ansi_bg(r,g,b)}\x1b[30m{glyph}{RESET}"  # bright → bg + black
+        return bg_esc(r,g,b) + FG_BLACK, True  # bright → bg + black
     if Y <= 40:
-        return f"{ansi_fg(r,g,b)}{glyph}{RESET}"          # dark → fg
-    return f"{ansi_bg(r,g,b)}\x1b[97m{glyph}{RESET}"      # mid → bg + white
+        return fg_esc(r,g,b), False            # dark → fg
+    return bg_esc(r,g,b) + FG_WHITE, True      # mid → bg + white
+
+def paint_cell(glyph, r, g, b, mode="auto", Y=None, color256=False):
+    """A single self-contained colored cell; see cell_style for mode."""
+    return cell_style(r, g, b, mode, Y, color256)[0] + glyph + RESET
+
+def paint_row(glyphs, colors, lumas, mode="auto", color256=False):
+    """
+    Color one row of cells. An escape is only emitted when the style changes
+    from the previous cell, and RESET only once at the end of the row, so
+    runs of equal color cost one escape instead of one per cell.
+    """
+    out = []; last = None; last_bg = False
+    for glyph, (r, g, b), Y in zip(glyphs, colors, lumas):
+        esc, bg = cell_style(r, g, b, mode, Y, color256)
+        if esc != last:
+            if last_bg and not bg: out.append(RESET)  # drop the old background
+            out.append(esc); last = esc; last_bg = bg
+        out.append(glyph)
+    out.append(RESET)
+    return b"".join(out)
+
+def _join_grid(table, idx):
+    """Monochrome output for a NumPy grid of glyph indices into table."""
+    n = len(table[0])
+    if all(len(g) == n for g in table):  # fixed-width glyphs: one byte gather
+        t = np.frombuffer(b"".join(table), np.uint8).reshape(-1, n)
+        rows = np.empty((idx.shape[0], idx.shape[1] * n + 1), np.uint8)
+        rows[:, :-1] = t[idx].reshape(idx.shape[0], -1)
+        rows[:, -1] = 10  # "\n"
+        return rows.tobytes()
+    glyphs = np.array(table, dtype=object)[idx]
+    return b"\n".join(b"".join(row) for row in glyphs.tolist()) + b"\n"
+
+PARALLEL_MIN_CELLS = 1 << 18  # smaller grids paint faster than workers fork
+
+# cell_style's escapes, split into parts indexed by style kind
+# (0 fg only, 1 bg + black glyph, 2 bg + white glyph) and channel value
+_KIND_PRE = {False: [b"\x1b[38;2;", b"\x1b[48;2;", b"\x1b[48;2;"],
+             True:  [b"\x1b[38;5;", b"\x1b[48;5;", b"\x1b[48;5;"]}
+_KIND_POST = [b"", FG_BLACK, FG_WHITE]
+_DEC_SEMI = [d + b";" for d in DEC]
+_DEC_M = [d + b"m" for d in DEC]
+
+def _paint_tile(table, idx, rgb, Y, mode, color256):
+    """
+    paint_row over every row of a NumPy grid at once. A cell's escape is
+    fully determined by its style kind and color, so runs are found by
+    comparing each cell with its left neighbour, and the escapes are gathered
+    part by part from small tables; the output is one join over the pieces.
+    """
+    rows, cols = idx.shape
+    c = rgb.astype(np.int64); Y = Y.astype(np.int64)
+    if mode == "fg":
+        kind = np.zeros(idx.shape, np.int64)
+    elif mode == "bg":
+        kind = np.where(Y >= 150, 1, 2)
+    else:
+        kind = np.where(Y >= 160, 1, np.where(Y <= 40, 0, 2))
+    if color256:
+        q = np.array(_CUBE_LEVEL, np.int64)[c]
+        chans = [16 + 36 * q[..., 0] + 6 * q[..., 1] + q[..., 2]]  # cube_index
+        decs = [_DEC_M]
+        key = (kind << 8) | chans[0]
+    else:
+        chans = [c[..., 0], c[..., 1], c[..., 2]]
+        decs = [_DEC_SEMI, _DEC_SEMI, _DEC_M]
+        key = (kind << 24) | (c[..., 0] << 16) | (c[..., 1] << 8) | c[..., 2]
+    chg = np.ones(idx.shape, bool)                  # the style changes here
+    chg[:, 1:] = key[:, 1:] != key[:, :-1]
+    bg = kind != 0
+    drop = np.zeros(idx.shape, bool)                # bg -> fg only: RESET first
+    drop[:, 1:] = chg[:, 1:] & bg[:, :-1] & ~bg[:, 1:]
+    n = len(chans) + 4                              # reset, pre, colors, post, glyph
+    pieces = np.full((rows, cols * n + 1), b"", dtype=object)
+    cells = pieces[:, :-1].reshape(rows, cols, n)
+    k = kind[chg]
+    cells[..., 0][drop] = RESET
+    cells[..., 1][chg] = np.array(_KIND_PRE[color256], dtype=object)[k]
+    for i, (ch, dec) in enumerate(zip(chans, decs)):
+        cells[..., 2 + i][chg] = np.array(dec, dtype=object)[ch[chg]]
+    cells[..., n - 2][chg] = np.array(_KIND_POST, dtype=object)[k]
+    cells[..., n - 1] = np.array(table, dtype=object)[idx]
+    pieces[:, -1] = RESET + b"\n"
+    pieces[-1, -1] = RESET
+    return b"".join(pieces.ravel().tolist())
+
+def _paint_grid(table, idx, rgb, Y, mode="auto", color256=False, jobs=1):
+    """
+    paint_row over a NumPy cell grid: glyph indices into table plus per-cell
+    RGB and luma. With jobs > 1, large grids are cut into bands of rows
+    painted in forked worker processes (assembling the pieces holds the GIL,
+    so threads would serialize). Where fork is unavailable, workers would
+    have to re-import this script, which costs more than painting, so the
+    grid is painted inline.
+    """
+    rows = idx.shape[0]
+    jobs = min(jobs, rows)
+    if jobs > 1 and idx.size >= PARALLEL_MIN_CELLS:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        cut = [rows * k // jobs for k in range(jobs + 1)]
+        bands = [slice(a, b) for a, b in zip(cut, cut[1:])]
+        try:
+            ctx = multiprocessing.get_context("fork")
+        except ValueError:  # e.g. Windows, where only spawn exists
+            ctx = None
+        if ctx is not None:
+            try:
+                with ProcessPoolExecutor(jobs, mp_context=ctx) as ex:
+                    tiles = ex.map(_paint_tile, [table] * jobs, [idx[s] for s in bands],
+                                   [rgb[s] for s in bands], [Y[s] for s in bands],
+                                   [mode] * jobs, [color256] * jobs)
+                    return b"\n".join(tiles) + b"\n"
+            except (OSError, NotImplementedError):
+                pass  # no process support here (e.g. no semaphores); paint inline
+    return _paint_tile(table, idx, rgb, Y, mode, color256) + b"\n"
 
 
 # ---------------- Character ramps ----------------
@@ -74,79 +273,407 @@ class RGBAImage:
     def __init__(self, w, h, buf_bytes):
         self.size = (w, h)
         self.buf = buf_bytes  # bytes length = w*h*4
+        self._nn_key = self._nn_cache = None
 
     def resize_nn(self, tw, th):
-        # nearest-neighbor resize (stdlib-only)
+        # nearest-neighbor resize
         w, h = self.size
-        out = bytearray(tw * th * 4)
+        if (tw, th) == (w, h):
+            return self  # identity mapping; images are never mutated in place
+        if np is not None:
+            ys, xs = self._nn_index(tw, th)
+            src = np.frombuffer(self.buf, np.uint8).reshape(h, w, 4)
+            return RGBAImage(tw, th, src[ys[:, None], xs[None, :]].tobytes())
+        # stdlib: gather each distinct source row once, repeat it when
+        # consecutive target rows land on the same one (upscaling)
+        xs = [min(w - 1, int(tx * w / tw)) * 4 for tx in range(tw)]
+        buf = self.buf
+        rows = []; last = -1
         for ty in range(th):
             sy = min(h - 1, int(ty * h / th))
-            row_off = sy * w * 4
-            for tx in range(tw):
-                sx = min(w - 1, int(tx * w / tw)) * 4
-                i = (ty * tw + tx) * 4
-                out[i:i+4] = self.buf[row_off + sx:row_off + sx + 4]
-        return RGBAImage(tw, th, bytes(out))
+            if sy != last:
+                row_off = sy * w * 4
+                row = b"".join([buf[row_off + sx:row_off + sx + 4] for sx in xs])
+                last = sy
+            rows.append(row)
+        return RGBAImage(tw, th, b"".join(rows))
+
+    def _nn_index(self, tw, th):
+        # Source row/column for each target pixel; cached per target size.
+        w, h = self.size
+        key = (tw, th)
+        if self._nn_key != key:
+            ys = np.minimum(h - 1, (np.arange(th) * h) // th)
+            xs = np.minimum(w - 1, (np.arange(tw) * w) // tw)
+            self._nn_key, self._nn_cache = key, (ys, xs)
+        return self._nn_cache
 
 
 # ---------------- PNG loader (non-interlaced) ----------------
 PNG_SIG = b"\x89PNG\r\n\x1a\n"
 
-def _paeth(a, b, c):
-    p = a + b - c
-    pa = abs(p - a); pb = abs(p - b); pc = abs(p - c)
-    return a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+# Usual sonames, tried before ctypes.util.find_library: on Linux that runs
+# ldconfig (and gcc/ld when ldconfig draws a blank), which costs far more
+# than a direct dlopen.
+_LIBDEFLATE_NAMES = ("libdeflate.so.0", "libdeflate.0.dylib", "libdeflate.dylib",
+                     "libdeflate.dll", "deflate.dll")
+
+def _load_libdeflate():
+    """Bind libdeflate's zlib decompressor via ctypes, or return None."""
+    try:
+        import ctypes
+    except ImportError:
+        return None
+    lib = None
+    for name in _LIBDEFLATE_NAMES:
+        try:
+            lib = ctypes.CDLL(name); break
+        except OSError:
+            pass
+    try:
+        if lib is None:
+            import ctypes.util
+            path = ctypes.util.find_library("deflate")
+            if not path: return None
+            lib = ctypes.CDLL(path)
+        alloc = lib.libdeflate_alloc_decompressor
+        inflate = lib.libdeflate_zlib_decompress
+        free = lib.libdeflate_free_decompressor
+    except (ImportError, OSError, AttributeError):
+        return None
+    alloc.restype = ctypes.c_void_p
+    alloc.argtypes = []
+    inflate.restype = ctypes.c_int
+    inflate.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_size_t,
+                        ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t)]
+    free.restype = None
+    free.argtypes = [ctypes.c_void_p]
+
+    def decompress(data, out_len):
+        # Returns None when the output doesn't fit out_len (or on bad data) so
+        # the caller can fall back to zlib and its error reporting.
+        dec = alloc()
+        if not dec: return None
+        try:
+            out = ctypes.create_string_buffer(out_len)
+            actual = ctypes.c_size_t(0)
+            if not isinstance(data, bytes):  # e.g. the IDAT bytearray, uncopied
+                data = (ctypes.c_char * len(data)).from_buffer(data)
+            if inflate(dec, data, len(data), out, out_len, ctypes.byref(actual)) != 0:
+                return None
+            return ctypes.string_at(out, actual.value)
+        finally:
+            free(dec)
+    return decompress
+
+_libdeflate_decompress = None  # bound on first PNG decode; False when unavailable
+
+def _libdeflate():
+    global _libdeflate_decompress
+    if _libdeflate_decompress is None:
+        _libdeflate_decompress = _load_libdeflate() or False
+    return _libdeflate_decompress
+
+def _inflate(data, out_len):
+    """zlib-decompress IDAT data; out_len is the size expected from IHDR."""
+    if _libdeflate():
+        raw = _libdeflate_decompress(data, out_len)
+        if raw is not None: return raw
+    # Ask for one byte more than IHDR allows: getting it means a zip bomb (or
+    # a corrupt file), and nothing past that byte is ever inflated.
+    dec = zlib.decompressobj()
+    raw = dec.decompress(data, out_len + 1)
+    if len(raw) > out_len: raise ValueError("PNG IDAT larger than IHDR allows")
+    if not dec.eof: raise zlib.error("incomplete or truncated stream")
+    return raw
+
+def _put_raw(raw, pos, part):
+    """Store an inflated piece at raw[pos:] (sized from IHDR); new end offset."""
+    end = pos + len(part)
+    if end > len(raw): raise ValueError("PNG IDAT larger than IHDR allows")
+    raw[pos:end] = part
+    return end
+
+_U32_BE = struct.Struct(">I")
 
 def _png_chunks(b):
-    i = 8; n = len(b)
+    # Payloads are memoryview slices, so IDAT data is never copied here.
+    mv = memoryview(b); i = 8; n = len(mv)
     while i + 8 <= n:
-        L = struct.unpack(">I", b[i:i+4])[0]
-        t = b[i+4:i+8]
+        L = _U32_BE.unpack_from(mv, i)[0]
+        t = bytes(mv[i+4:i+8])
         s = i + 8; e = s + L
-        payload = b[s:e]
         i = e + 4  # skip CRC
-        yield t, payload
+        yield t, mv[s:e]
 
-def _unfilter(raw, w, h, bpp_bytes):
-    stride = w * bpp_bytes
-    out = bytearray(h * stride)
-    prev = bytearray(stride)
-    mv = memoryview(raw)
-    off = 0; oi = 0
-    for _ in range(h):
-        f = mv[off]; off += 1
-        s = mv[off:off+stride]; off += stride
-        d = memoryview(out)[oi:oi+stride]
+# Scalar Sub/Average/Paeth rows over bytes-like s and prev. Each byte only
+# depends on the byte bpp_bytes to its left, so a row is bpp_bytes independent
+# channel planes; walking one plane keeps left (a) and upper-left (c) in
+# locals, with no x >= bpp_bytes test or d[x - bpp_bytes] lookup per byte.
+# Both start at 0, which is exactly the prefix rule for the first pixel.
+def _sub_row(s, bpp_bytes):
+    d = bytearray(len(s))
+    for ch in range(bpp_bytes):
+        a = 0; plane = []
+        for v in s[ch::bpp_bytes]:
+            a = (v + a) & 0xFF; plane.append(a)
+        d[ch::bpp_bytes] = bytes(plane)
+    return d
+
+def _avg_row(s, prev, bpp_bytes):
+    d = bytearray(len(s))
+    for ch in range(bpp_bytes):
+        a = 0; plane = []
+        for v, b in zip(s[ch::bpp_bytes], prev[ch::bpp_bytes]):
+            a = (v + ((a + b) >> 1)) & 0xFF; plane.append(a)
+        d[ch::bpp_bytes] = bytes(plane)
+    return d
+
+def _paeth_row(s, prev, bpp_bytes):
+    d = bytearray(len(s))
+    for ch in range(bpp_bytes):
+        a = c = 0; plane = []
+        for v, b in zip(s[ch::bpp_bytes], prev[ch::bpp_bytes]):
+            pa = abs(b - c); pb = abs(a - c); pc = abs(a + b - c - c)  # |p-a|, |p-b|, |p-c|
+            a = (v + (a if pa <= pb and pa <= pc else (b if pb <= pc else c))) & 0xFF
+            c = b; plane.append(a)
+        d[ch::bpp_bytes] = bytes(plane)
+    return d
+
+def _paeth_np(a, b, c):
+    # Branchless Paeth predictor over int16 arrays.
+    p = a + b - c
+    pa = np.abs(p - a); pb = np.abs(p - b); pc = np.abs(p - c)
+    return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+BAND_MIN = 16   # shorter Avg/Paeth runs are cheaper in the row loop
+BAND_MAX = 512  # longer runs are split: a band's scratch grows with H*(H+W)
+
+def _wavefront_band(s, paeth, prev, bpp_bytes):
+    """
+    Unfilter a run of consecutive Average/Paeth rows (paeth: per-row bool)
+    as an anti-diagonal wavefront. Pixel (x, y) only needs its left, up and
+    up-left neighbours, so every pixel on the diagonal x+y=k can be predicted
+    at once. Rows are stored skewed (row r shifted right by r) so each
+    diagonal is a plain column.
+    """
+    H, stride = s.shape
+    n = stride // bpp_bytes
+    s = s.reshape(H, n, bpp_bytes)
+    z = np.zeros((H + 1, H + n + 2, bpp_bytes), np.int16)  # (r, x) at column x+r+2
+    sk = np.zeros(z.shape, np.uint8)  # filtered bytes, skewed like z
+    z[0, 2:n+2] = prev.reshape(n, bpp_bytes)
+    for r in range(1, H + 1):
+        sk[r, r+2:r+2+n] = s[r-1]
+    mixed = not (paeth.all() or not paeth.any())
+    pm = np.concatenate([[False], paeth])[:, None]  # indexed like z rows
+    for k in range(1, H + n):                      # k = x + r
+        r0 = max(1, k - n + 1); r1 = min(H, k) + 1
+        a = z[r0:r1, k+1]; b = z[r0-1:r1-1, k+1]; c = z[r0-1:r1-1, k]
+        if mixed:
+            pred = np.where(pm[r0:r1], _paeth_np(a, b, c), (a + b) >> 1)
+        else:
+            pred = _paeth_np(a, b, c) if paeth[0] else (a + b) >> 1
+        z[r0:r1, k+2] = (sk[r0:r1, k+2] + pred) & 0xFF
+    out = np.empty((H, n, bpp_bytes), np.uint8)
+    for r in range(1, H + 1):
+        out[r-1] = z[r, r+2:r+2+n]
+    return out.reshape(H, stride)
+
+def _unfilter_np(raw, stride, h, bpp_bytes):
+    # None/Sub/Up are whole-row NumPy ops; Avg/Paeth fall back to int lists,
+    # except long runs of them which are decoded as a wavefront.
+    src = np.frombuffer(raw, np.uint8, h * (stride + 1)).reshape(h, stride + 1)
+    fs = src[:, 0].tolist()
+    out = np.empty((h, stride), np.uint8)
+    prev = np.zeros(stride, np.uint8)
+    y = 0
+    while y < h:
+        f = fs[y]; s = src[y, 1:]; d = out[y]
+        if f == 3 or f == 4:
+            e = y + 1
+            while e < h and fs[e] in (3, 4) and e - y < BAND_MIN: e += 1
+            if e - y == BAND_MIN:
+                while e < h and fs[e] in (3, 4) and e - y < BAND_MAX: e += 1
+                paeth = np.array(fs[y:e]) == 4
+                out[y:e] = _wavefront_band(src[y:e, 1:], paeth, prev, bpp_bytes)
+                prev = out[e - 1]; y = e
+                continue
         if f == 0:
             d[:] = s
         elif f == 1:
-            for x in range(stride):
-                left = d[x - bpp_bytes] if x >= bpp_bytes else 0
-                d[x] = (s[x] + left) & 0xFF
+            np.add.accumulate(s.reshape(-1, bpp_bytes), axis=0, dtype=np.uint8,
+                              out=d.reshape(-1, bpp_bytes))
         elif f == 2:
+            np.add(s, prev, out=d)  # uint8 wraps mod 256
+        elif f == 3:
+            d[:] = _avg_row(s.tobytes(), prev.tobytes(), bpp_bytes)
+        elif f == 4:
+            d[:] = _paeth_row(s.tobytes(), prev.tobytes(), bpp_bytes)
+        else:
+            raise ValueError("PNG filter type not supported")
+        prev = d; y += 1
+    return out.tobytes()
+
+def _unfilter_kernel(src, out, bpp_bytes):
+    """
+    Scalar unfilter over (h, stride+1) -> (h, stride) uint8 arrays, meant to
+    be compiled by Numba. Returns -1, or the first row with a bad filter.
+    """
+    h, stride = out.shape
+    for y in range(h):
+        f = src[y, 0]
+        if f == 0:
+            for x in range(stride):
+                out[y, x] = src[y, x+1]
+        elif f == 1:
             for x in range(stride):
-                d[x] = (s[x] + prev[x]) & 0xFF
+                a = out[y, x-bpp_bytes] if x >= bpp_bytes else 0
+                out[y, x] = (src[y, x+1] + a) & 0xFF
+        elif f == 2:  # no intra-row dependency: a prange-able copy-add
+            if y == 0:
+                for x in range(stride):
+                    out[y, x] = src[y, x+1]
+            else:
+                for x in range(stride):
+                    out[y, x] = (src[y, x+1] + out[y-1, x]) & 0xFF
         elif f == 3:
             for x in range(stride):
-                left = d[x - bpp_bytes] if x >= bpp_bytes else 0
-                up = prev[x]
-                d[x] = (s[x] + ((left + up) >> 1)) & 0xFF
+                a = out[y, x-bpp_bytes] if x >= bpp_bytes else 0
+                b = out[y-1, x] if y else 0
+                out[y, x] = (src[y, x+1] + ((a + b) >> 1)) & 0xFF
         elif f == 4:
             for x in range(stride):
-                left = d[x - bpp_bytes] if x >= bpp_bytes else 0
-                up = prev[x]
-                ul = prev[x - bpp_bytes] if x >= bpp_bytes else 0
-                d[x] = (s[x] + _paeth(left, up, ul)) & 0xFF
+                a = np.int32(out[y, x-bpp_bytes]) if x >= bpp_bytes else np.int32(0)
+                b = np.int32(out[y-1, x]) if y else np.int32(0)
+                c = np.int32(out[y-1, x-bpp_bytes]) if y and x >= bpp_bytes else np.int32(0)
+                pa = abs(b - c); pb = abs(a - c); pc = abs(a + b - 2*c)
+                p = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                out[y, x] = (src[y, x+1] + p) & 0xFF
         else:
-            raise ValueError("PNG filter type not supported")
-        prev[:] = d
-        oi += stride
-    return bytes(out)
+            return y
+    return -1
 
-def _unpack_bits(row_bytes, w, bits_per_sample, spp):
-    """Expand <=8-bit packed samples to 8-bit per sample."""
-    out = []
+JIT_MIN_BYTES = 8 << 20  # importing Numba (~0.5s) only pays off above this
+_unfilter_jit = None     # compiled kernel; False once Numba proved unusable
+
+def _unfilter_numba(raw, stride, h, bpp_bytes):
+    """Unfilter with the Numba-compiled kernel; None if Numba is unusable."""
+    global _unfilter_jit
+    if _unfilter_jit is None:
+        try:
+            from numba import njit
+            _unfilter_jit = njit(cache=True, boundscheck=False)(_unfilter_kernel)
+        except ImportError:
+            _unfilter_jit = False
+    if not _unfilter_jit: return None
+    src = np.frombuffer(raw, np.uint8, h * (stride + 1)).reshape(h, stride + 1)
+    out = np.empty((h, stride), np.uint8)
+    try:
+        bad = _unfilter_jit(src, out, bpp_bytes)
+    except Exception:  # compile or cache failure: stop trying, use NumPy
+        _unfilter_jit = False
+        return None
+    if bad >= 0: raise ValueError("PNG filter type not supported")
+    return out.tobytes()
+
+# SWAR helpers for the stdlib fallback: a pixel (or a whole row) is packed
+# into one Python int so the bytewise mod-256 arithmetic of Sub, Up and Avg
+# runs once per pixel or row instead of once per byte.
+_LANE_FMT = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+def _swar_masks(n):
+    """(0x7f.., 0x80.., 0xfe..) lane masks for n packed bytes."""
+    return tuple(int.from_bytes(bytes([m]) * n, "little") for m in (0x7F, 0x80, 0xFE))
+
+def _lanes(buf, n, m):
+    # n-byte pixels -> one little-endian int each, zero-padded to m bytes
+    if m != n:
+        pad = bytearray(len(buf) // n * m)
+        for c in range(n): pad[c::m] = buf[c::n]
+        buf = pad
+    return list(struct.unpack("<%d%s" % (len(buf) // m, _LANE_FMT[m]), buf))
+
+def _unlanes(vals, n, m):
+    buf = struct.pack("<%d%s" % (len(vals), _LANE_FMT[m]), *vals)
+    if m == n: return buf
+    out = bytearray(len(vals) * n)
+    for c in range(n): out[c::n] = buf[c::m]
+    return out
+
+def _sub_swar(s, n):
+    m = n if n in _LANE_FMT else (4 if n < 4 else 8)  # RGB rides in 4 bytes
+    lo, hi, _ = _swar_masks(m)
+    acc = 0; out = []
+    for v in _lanes(s, n, m):
+        acc = ((acc & lo) + (v & lo)) ^ ((acc ^ v) & hi)  # m bytewise adds
+        out.append(acc)
+    return _unlanes(out, n, m)
+
+def _up_swar(s, prev):
+    lo, hi, _ = _swar_masks(len(s))
+    a = int.from_bytes(s, "little"); b = int.from_bytes(prev, "little")
+    return (((a & lo) + (b & lo)) ^ ((a ^ b) & hi)).to_bytes(len(s), "little")
+
+def _avg_swar(s, prev, n):
+    m = n if n in _LANE_FMT else (4 if n < 4 else 8)
+    lo, hi, fe = _swar_masks(m)
+    acc = 0; out = []
+    for v, b in zip(_lanes(s, n, m), _lanes(prev, n, m)):
+        a = (acc & b) + (((acc ^ b) & fe) >> 1)  # bytewise floor((a+b)/2)
+        acc = ((v & lo) + (a & lo)) ^ ((v ^ a) & hi)
+        out.append(acc)
+    return _unlanes(out, n, m)
+
+def _row_filters(bpp_bytes):
+    """
+    Stdlib row reconstructors for one image, picked once from its pixel size
+    and then looked up per row by filter type. Each takes (filtered row,
+    previous output row, bytes per pixel).
+    """
+    if bpp_bytes < 4:  # RGB and narrower: channel planes beat SWAR lanes
+        sub = lambda s, prev, n: _sub_row(s, n); avg = _avg_row
+    else:              # RGBA and 16-bit: a whole pixel per lane wins
+        sub = lambda s, prev, n: _sub_swar(s, n); avg = _avg_swar
+    return {1: sub, 2: lambda s, prev, n: _up_swar(s, prev), 3: avg, 4: _paeth_row}
+
+def _unfilter(raw, stride, h, bpp_bytes):
+    """stride is the packed row length in bytes, excluding the filter byte."""
+    if np is not None:
+        src = np.frombuffer(raw, np.uint8, h * (stride + 1)).reshape(h, stride + 1)
+        if not src[:, 0].any():  # all rows filter None: just drop the filter bytes
+            return src[:, 1:].tobytes()
+        if h * stride >= JIT_MIN_BYTES:
+            scan = _unfilter_numba(raw, stride, h, bpp_bytes)
+            if scan is not None: return scan
+        return _unfilter_np(raw, stride, h, bpp_bytes)
+    # array('B') rows: contiguous byte storage with cheap slice assignment
+    out = array.array("B", bytes(h * stride))
+    rows = memoryview(out); mv = memoryview(raw)
+    prev = memoryview(bytes(stride))  # then a view of the row just written
+    row_filters = _row_filters(bpp_bytes)
+    off = 0; oi = 0
+    for y in range(h):
+        f = mv[off]; off += 1
+        s = mv[off:off+stride]; off += stride
+        d = rows[oi:oi+stride]; oi += stride
+        if f == 0 or (f == 2 and y == 0):  # None, or Up over the zero row
+            d[:] = s
+        else:
+            row_filter = row_filters.get(f)
+            if row_filter is None: raise ValueError("PNG filter type not supported")
+            d[:] = row_filter(s, prev, bpp_bytes)
+        prev = d
+    return out.tobytes()
+
+def _unpack_bits(row_bytes, w, bits_per_sample, spp, scale=True):
+    """
+    Expand <=8-bit packed samples to 8-bit per sample. With scale=False the
+    raw sample values are kept (palette indices). Row by row for the stdlib
+    path; with NumPy, load_png unpacks the whole image in _samples_np.
+    """
     total = w * spp
+    out = []
     acc = 0; nbits = 0
     it = iter(row_bytes)
     while len(out) < total:
@@ -160,26 +687,64 @@ def _unpack_bits(row_bytes, w, bits_per_sample, spp):
         shift = nbits - bits_per_sample
         val = (acc >> shift) & ((1 << bits_per_sample) - 1)
         nbits -= bits_per_sample
-        if bits_per_sample == 1:
-            val = 0 if val == 0 else 255
-        elif bits_per_sample == 2:
-            val = val * 85
-        elif bits_per_sample == 4:
-            val = val * 17
+        if scale:
+            val *= 255 // ((1 << bits_per_sample) - 1)  # 1→255, 2→85, 4→17
         out.append(val)
     while len(out) < total:
         out.append(0)
     return bytes(out)
 
+# color type -> (samples per pixel, mode)
+PNG_COLOR_TYPES = {0: (1, "G"), 2: (3, "RGB"), 3: (1, "P"), 4: (2, "GA"), 6: (4, "RGBA")}
+
+def _png_raw_len(ihdr):
+    """Size of the decompressed IDAT stream (filter byte + packed row) * h."""
+    w, h, bit_depth, color_type = ihdr[:4]
+    if color_type not in PNG_COLOR_TYPES: raise ValueError("Unsupported PNG color type")
+    return h * ((w * PNG_COLOR_TYPES[color_type][0] * bit_depth + 7) // 8 + 1)
+
+def _samples_np(scan, w, h, bit_depth, spp, scale=True):
+    """Whole unfiltered image -> (h, w, spp) uint8 samples (see _unpack_bits)."""
+    stride = (w * spp * bit_depth + 7) // 8
+    a = np.frombuffer(scan, np.uint8, h * stride).reshape(h, stride)
+    if bit_depth == 16:
+        a = a.reshape(h, w * spp, 2)[..., 0]  # MSB of each big-endian sample
+    elif bit_depth == 1:
+        a = np.unpackbits(a, axis=1)[:, :w*spp]
+    elif bit_depth < 8:  # 2/4-bit: shift/mask beats unpackbits + regrouping
+        shifts = np.arange(8 - bit_depth, -1, -bit_depth, dtype=np.uint8)
+        a = ((a[..., None] >> shifts) & ((1 << bit_depth) - 1)).reshape(h, -1)[:, :w*spp]
+    if scale and bit_depth < 8:
+        a = a * np.uint8(255 // ((1 << bit_depth) - 1))
+    return a.reshape(h, w, spp)
+
+def _palette_lut(plte, trns):
+    """(256, 4) RGBA table; indices past PLTE are black, past tRNS opaque."""
+    lut = np.zeros((256, 4), np.uint8); lut[:, 3] = 255
+    pal = np.frombuffer(plte, np.uint8, len(plte) // 3 * 3).reshape(-1, 3)[:256]
+    lut[:len(pal), :3] = pal
+    if trns:
+        t = np.frombuffer(trns, np.uint8)[:256]
+        lut[:len(t), 3] = t
+    return lut
+
 def load_png(path):
     b = open(path, "rb").read()
     if not b.startswith(PNG_SIG): return None
-    ihdr = None; plte = None; trns = None; idat = bytearray()
+    ihdr = None; plte = None; trns = None
+    # libdeflate needs the whole stream at once; zlib can take IDATs one by
+    # one, which spares the concatenated copy of the compressed data.
+    idat = bytearray(); dec = raw = None; pos = 0
     for t, p in _png_chunks(b):
         if t == b'IHDR': ihdr = struct.unpack(">IIBBBBB", p)
         elif t == b'PLTE': plte = p
         elif t == b'tRNS': trns = p
-        elif t == b'IDAT': idat.extend(p)
+        elif t == b'IDAT':
+            if _libdeflate() or not ihdr:
+                idat.extend(p); continue
+            if dec is None:
+                dec = zlib.decompressobj(); raw = bytearray(_png_raw_len(ihdr))
+            pos = _put_raw(raw, pos, dec.decompress(p, len(raw) - pos + 1))  # see _inflate
         elif t == b'IEND': break
     if not ihdr: raise ValueError("PNG missing IHDR")
 
@@ -187,34 +752,46 @@ def load_png(path):
     if comp or flt or interlace:
         raise ValueError("Only non-interlaced PNG supported")
 
-    if color_type == 0: spp, mode = 1, "G"
-    elif color_type == 2: spp, mode = 3, "RGB"
-    elif color_type == 3: spp, mode = 1, "P"
-    elif color_type == 4: spp, mode = 2, "GA"
-    elif color_type == 6: spp, mode = 4, "RGBA"
-    else: raise ValueError("Unsupported PNG color type")
+    if color_type not in PNG_COLOR_TYPES: raise ValueError("Unsupported PNG color type")
+    spp, mode = PNG_COLOR_TYPES[color_type]
 
     bpp = max(1, (spp * bit_depth + 7) // 8)
-    raw = zlib.decompress(bytes(idat))
-    scan = _unfilter(raw, w, h, bpp)
-
-    out = bytearray(w * h * 4)
+    if dec is not None:
+        pos = _put_raw(raw, pos, dec.flush())
+        if not dec.eof: raise zlib.error("incomplete or truncated stream")
+        del raw[pos:]
+    else:
+        raw = _inflate(idat, _png_raw_len(ihdr))
+    scan = _unfilter(raw, (w * spp * bit_depth + 7) // 8, h, bpp)
 
     if mode == "P":
         if not plte: raise ValueError("Palette missing")
+        if np is not None:  # one gather through the palette table
+            idx = _samples_np(scan, w, h, bit_depth, 1, scale=False)[..., 0]
+            return RGBAImage(w, h, _palette_lut(plte, trns)[idx].tobytes())
+        out = bytearray(w * h * 4)
         pal = [tuple(plte[i:i+3]) for i in range(0, len(plte), 3)]
         alpha = list(trns) if trns else []
         row_stride = (w * bit_depth + 7) // 8
         off = 0; di = 0
         for _ in range(h):
             rb = scan[off:off+row_stride]; off += row_stride
-            smp = _unpack_bits(rb, w, bit_depth, 1) if bit_depth < 8 else rb
+            smp = _unpack_bits(rb, w, bit_depth, 1, scale=False) if bit_depth < 8 else rb
             for x in range(w):
                 idx = smp[x]
                 r, g, b_ = pal[idx] if idx < len(pal) else (0,0,0)
                 a = alpha[idx] if idx < len(alpha) else 255
                 out[di:di+4] = bytes((r, g, b_, a)); di += 4
+    elif mode == "RGBA" and bit_depth == 8:
+        return RGBAImage(w, h, scan)  # already the container's layout
+    elif np is not None:
+        smp = _samples_np(scan, w, h, bit_depth, spp)
+        rgba = np.empty((h, w, 4), np.uint8)
+        rgba[..., :3] = smp[..., :3] if mode in ("RGB", "RGBA") else smp[..., :1]
+        rgba[..., 3] = smp[..., -1] if mode in ("GA", "RGBA") else 255
+        return RGBAImage(w, h, rgba.tobytes())
     else:
+        out = bytearray(w * h * 4)
         di = 0; off = 0
         for _ in range(h):
             bytes_per_sample = 1 if bit_depth == 8 else 2
@@ -263,8 +840,17 @@ def load_png(path):
 
 
 # ---------------- BMP / PPM loaders ----------------
+def _map_file(p):
+    """Read-only mmap of the file: headers and pixel rows are sliced straight
+    from the page cache instead of first being copied into one big bytes."""
+    with open(p, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
 def load_bmp(p):
-    d = open(p, "rb").read()
+    with _map_file(p) as d:
+        return _load_bmp(d)
+
+def _load_bmp(d):
     if len(d) < 54 or d[:2] != b"BM": return None
     dib = struct.unpack("<I", d[14:18])[0]
     if dib < 40: raise ValueError("BMP: unsupported DIB header")
@@ -273,48 +859,59 @@ def load_bmp(p):
     if bpp not in (24,32): raise ValueError("BMP: only 24/32-bit")
     off = struct.unpack("<I", d[10:14])[0]
     row = ((bpp * w + 31)//32)*4
-    px = d[off:]
-    out = bytearray(abs(h) * w * 4)
     height = abs(h)
-    for rowi in range(height):
-        sy = rowi if h < 0 else height - 1 - rowi
-        ro = sy * row
-        di = rowi * w * 4
-        for x in range(w):
-            if bpp == 24:
-                b, g, r = px[ro + x*3: ro + x*3 + 3]
-                a = 255
-            else:
-                b, g, r, a = px[ro + x*4: ro + x*4 + 4]
-            out[di:di+4] = bytes((r,g,b,a)); di += 4
+    n = bpp // 8; rb = w * n
+    if np is not None:  # strided view of the pixel rows, flipped, reordered
+        px = np.frombuffer(d, np.uint8, row * height, off).reshape(height, row)[:, :rb]
+        px = px.reshape(height, w, n)[::-1 if h > 0 else 1]
+        rgba = np.empty((height, w, 4), np.uint8)
+        rgba[..., :3] = px[..., 2::-1]  # BGR -> RGB
+        rgba[..., 3] = px[..., 3] if bpp == 32 else 255
+        return RGBAImage(w, height, rgba.tobytes())
+    # top-down copy of the rows without padding, then BGR(A) -> RGBA with
+    # extended-slice assignment, one C-level pass per channel
+    order = range(height) if h < 0 else range(height - 1, -1, -1)
+    src = b"".join([d[off + sy*row:off + sy*row + rb] for sy in order])
+    out = bytearray(height * w * 4)
+    out[0::4] = src[2::n]; out[1::4] = src[1::n]; out[2::4] = src[0::n]
+    out[3::4] = src[3::4] if bpp == 32 else b"\xff" * (w * height)
     return RGBAImage(w, height, bytes(out))
 
 def load_ppm_pgm(p):
-    f = open(p, "rb")
-    m = f.read(2)
+    with _map_file(p) as d:
+        return _load_ppm_pgm(d)
+
+def _load_ppm_pgm(d):
+    m = d[:2]
     if m not in (b"P5", b"P6"): return None
+    pos = 2
     def tok():
-        t=b""; c=f.read(1)
-        while c and c in b" \t\r\n": c=f.read(1)
-        while c == b"#":
-            while c and c not in b"\r\n": c=f.read(1)
-            while c and c in b" \t\r\n": c=f.read(1)
-        while c and c not in b" \t\r\n":
-            t += c; c = f.read(1)
+        nonlocal pos
+        n = len(d)
+        while pos < n and d[pos] in b" \t\r\n": pos += 1
+        while pos < n and d[pos] == 0x23:  # '#' comment to end of line
+            while pos < n and d[pos] not in b"\r\n": pos += 1
+            while pos < n and d[pos] in b" \t\r\n": pos += 1
+        start = pos
+        while pos < n and d[pos] not in b" \t\r\n": pos += 1
+        t = d[start:pos]
+        pos += 1  # the single whitespace byte that ends the token
         return t
     w = int(tok()); h = int(tok()); mv = int(tok())
     if mv != 255: raise ValueError("PPM/PGM: only maxval 255")
     count = w * h * (1 if m == b"P5" else 3)
-    data = f.read(count)
-    out = bytearray(w*h*4); si = 0; di = 0
+    if np is not None and m == b"P5":
+        # gray -> one little-endian uint32 (g, g, g, 255) per pixel
+        v = np.frombuffer(d, np.uint8, count, pos).astype(np.uint32) * 0x010101
+        return RGBAImage(w, h, (v | 0xFF000000).astype("<u4").tobytes())
+    out = bytearray(w*h*4)
     if m == b"P5":
-        for _ in range(w*h):
-            g = data[si]; si += 1
-            out[di:di+4] = bytes((g,g,g,255)); di += 4
+        out[0::4] = out[1::4] = out[2::4] = d[pos:pos + count]
     else:
-        for _ in range(w*h):
-            r, g, b_ = data[si:si+3]; si += 3
-            out[di:di+4] = bytes((r,g,b_,255)); di += 4
+        out[0::4] = d[pos:pos + count:3]
+        out[1::4] = d[pos + 1:pos + count:3]
+        out[2::4] = d[pos + 2:pos + count:3]
+    out[3::4] = b"\xff" * (w*h)
     return RGBAImage(w, h, bytes(out))
 
 
@@ -330,8 +927,58 @@ def load_image(p):
 
 
 # ---------------- Scaling to “text cells” ----------------
+def _load_smooth_resize():
+    """
+    Filtered RGBA downscaler from cykooz.resizer (SIMD convolution) or
+    Pillow, as resize(buf, w, h, tw, th, box) -> bytes; None if neither is
+    installed. box=True averages (what ascii/blocks cells want anyway),
+    otherwise Lanczos3 keeps edges crisp for the half/braille dot grids.
+    """
+    try:
+        try:
+            from cykooz_resizer import (FilterType, ImageData, PixelType,
+                                        ResizeAlg, ResizeOptions, Resizer)
+        except ImportError:  # releases before 4.0
+            from cykooz.resizer import (FilterType, ImageData, PixelType,
+                                        ResizeAlg, ResizeOptions, Resizer)
+        resizer = Resizer()
+        opts = {box: ResizeOptions(ResizeAlg.convolution(f))
+                for box, f in ((True, FilterType.box), (False, FilterType.lanczos3))}
+
+        def resize(buf, w, h, tw, th, box):
+            dst = ImageData(tw, th, PixelType.U8x4)
+            resizer.resize(ImageData(w, h, PixelType.U8x4, buf), dst, opts[box])
+            return dst.get_buffer()
+        return resize
+    except ImportError:
+        pass
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    filters = getattr(Image, "Resampling", Image)
+
+    def resize(buf, w, h, tw, th, box):
+        im = Image.frombuffer("RGBA", (w, h), buf, "raw", "RGBA", 0, 1)
+        return im.resize((tw, th), filters.BOX if box else filters.LANCZOS).tobytes()
+    return resize
+
+_smooth_resize = None  # loaded on first downscale; False when unavailable
+
+def _resize_cells(img, tw, th, mode, resample="auto"):
+    """resize_nn, or the smooth backend when shrinking with resample='auto'."""
+    global _smooth_resize
+    w, h = img.size
+    if resample == "auto" and tw <= w and th <= h and (tw, th) != (w, h):
+        if _smooth_resize is None:
+            _smooth_resize = _load_smooth_resize() or False
+        if _smooth_resize:
+            box = mode not in ("half", "braille")
+            return RGBAImage(tw, th, _smooth_resize(img.buf, w, h, tw, th, box))
+    return img.resize_nn(tw, th)
+
 def scale_to_cells(img, mode, width_cells=None, height_cells=None,
-                   char_aspect=None, natural=False):
+                   char_aspect=None, natural=False, resample="auto"):
     """
     Convert desired *cell* grid into a pixel resize for the renderer.
     For ASCII/blocks, characters are ~2:1 tall:wide → char_aspect ~= 0.5.
@@ -339,6 +986,9 @@ def scale_to_cells(img, mode, width_cells=None, height_cells=None,
 
     If natural=True, ignore width/height and return the image scaled so that
     one cell represents the native cluster size for the mode.
+
+    resample='auto' shrinks through cykooz.resizer or Pillow when one is
+    installed; 'nearest' always uses the built-in nearest-neighbor resize.
     """
     w, h = img.size
 
@@ -360,7 +1010,7 @@ def scale_to_cells(img, mode, width_cells=None, height_cells=None,
         else:  # ascii/blocks
             width_cells, height_cells = w, h
         tw, th = max(1, width_cells * pxw), max(1, height_cells * pxh)
-        return img.resize_nn(tw, th), width_cells, height_cells
+        return _resize_cells(img, tw, th, mode, resample), width_cells, height_cells
 
     # Fit-to-window behavior
     if width_cells is None and height_cells is None:
@@ -372,26 +1022,37 @@ def scale_to_cells(img, mode, width_cells=None, height_cells=None,
         width_cells = max(1, int((w / float(h)) * height_cells / eff))
 
     tw, th = max(1, width_cells * pxw), max(1, height_cells * pxh)
-    return img.resize_nn(tw, th), width_cells, height_cells
+    return _resize_cells(img, tw, th, mode, resample), width_cells, height_cells
 
 
 # ---------------- Renderers ----------------
+def _cell_spans(size, cells):
+    """Pixel [start, stop) of each cell along one axis; never empty."""
+    starts = [int(c * (size / cells)) for c in range(cells + 1)]
+    return [(a, max(a + 1, b)) for a, b in zip(starts, starts[1:])]
+
 def render_blocks(img, width=None, height=None, ramp="ascii", gamma=1.0,
-                  color=False, color_mode="auto", char_aspect=None, natural=False):
+                  color=False, color_mode="auto", char_aspect=None, natural=False,
+                  color256=False, jobs=1, resample="auto"):
     ramp_str = RAMPS.get(ramp, ramp)
     img, cells_w, cells_h = scale_to_cells(img, "blocks", width, height,
-                                           char_aspect=char_aspect, natural=natural)
+                                           char_aspect=char_aspect, natural=natural,
+                                           resample=resample)
+    lut = gamma_lut(gamma)
+    if not color:  # gamma folded into the glyph table: raw luma -> glyph
+        glyphs, lut = ramp_lut(ramp_str, lut), None
+    else:  # paint_row still needs the corrected luma itself
+        glyphs = ramp_lut(ramp_str)
+    if np is not None:
+        return _render_blocks_np(img, glyphs, lut, color, color_mode, color256, jobs)
     w, h = img.size
     px = img.buf
     out = []
+    xs = _cell_spans(w, cells_w)
 
-    for cy in range(cells_h):
-        y0 = int(cy * (h / cells_h))
-        y1 = max(y0 + 1, int((cy + 1) * (h / cells_h)))
-        row = []
-        for cx in range(cells_w):
-            x0 = int(cx * (w / cells_w))
-            x1 = max(x0 + 1, int((cx + 1) * (w / cells_w)))
+    for y0, y1 in _cell_spans(h, cells_h):
+        row = []; colors = []; lumas = []
+        for x0, x1 in xs:
             rs = gs = bs = cnt = 0
             for y in range(y0, y1):
                 off = y * w * 4
@@ -406,22 +1067,36 @@ def render_blocks(img, width=None, height=None, ramp="ascii", gamma=1.0,
                     rs += r; gs += g; bs += b; cnt += 1
             r = rs // cnt; g = gs // cnt; b = bs // cnt
             Y = luma(r,g,b)
-            if gamma != 1.0:
-                Y = int((Y/255.0) ** gamma * 255 + 0.5)
-            glyph = ramp_str[int((Y/255.0) * (len(ramp_str) - 1) + 0.5)]
-            row.append(paint_cell(glyph, r, g, b, color_mode, Y) if color else glyph)
-        out.append("".join(row))
-    return "\n".join(out)
+            if lut: Y = lut[Y]
+            row.append(glyphs[Y]); colors.append((r, g, b)); lumas.append(Y)
+        out.append(paint_row(row, colors, lumas, color_mode, color256) if color else b"".join(row))
+    return b"\n".join(out) + b"\n"
+
+
+def _render_blocks_np(img, ramp_glyphs, lut, color, color_mode, color256, jobs=1):
+    # scale_to_cells sized the image to one pixel per cell: no averaging left
+    w, h = img.size
+    rgb, Y = _pixels_to_luma(np.frombuffer(img.buf, np.uint8).reshape(h, w, 4), lut)
+    if not color:
+        return _join_grid(ramp_glyphs, Y)
+    return _paint_grid(ramp_glyphs, Y, rgb, Y, color_mode, color256, jobs)
+
 
+HALF_GLYPHS = [g.encode("utf-8") for g in " ▄▀█"]  # index: (top dark)*2 + (bottom dark)
 
 def render_half(img, width=None, height=None, gamma=1.0,
-                color=False, color_mode="auto", natural=False):
-    img, cells_w, cells_h = scale_to_cells(img, "half", width, height, natural=natural)
+                color=False, color_mode="auto", natural=False, color256=False, jobs=1,
+                resample="auto"):
+    img, cells_w, cells_h = scale_to_cells(img, "half", width, height, natural=natural,
+                                           resample=resample)
+    lut = gamma_lut(gamma)
+    if np is not None:
+        return _render_half_np(img, lut, color, color_mode, color256, jobs)
     w, h = img.size
     px = img.buf
     out = []
     for y in range(0, h, 2):
-        row = []
+        row = []; colors = []; lumas = []
         for x in range(w):
             i1 = (y*w + x) * 4
             r1, g1, b1, a1 = px[i1], px[i1+1], px[i1+2], px[i1+3]
@@ -443,36 +1118,89 @@ def render_half(img, width=None, height=None, gamma=1.0,
                 r2 = g2 = b2 = 255
 
             Y1, Y2 = luma(r1,g1,b1), luma(r2,g2,b2)
-            if gamma != 1.0:
-                Y1 = int((Y1/255.0) ** gamma * 255 + 0.5)
-                Y2 = int((Y2/255.0) ** gamma * 255 + 0.5)
+            if lut:
+                Y1 = lut[Y1]; Y2 = lut[Y2]
 
             if Y1 < 128 and Y2 < 128:
-                glyph = '█'; cr = ((r1+r2)//2, (g1+g2)//2, (b1+b2)//2)
+                glyph = HALF_GLYPHS[3]; cr = ((r1+r2)//2, (g1+g2)//2, (b1+b2)//2)
                 Yg = luma(*cr)
             elif Y1 < 128:
-                glyph = '▀'; cr = (r1,g1,b1); Yg = Y1
+                glyph = HALF_GLYPHS[2]; cr = (r1,g1,b1); Yg = Y1
             elif Y2 < 128:
-                glyph = '▄'; cr = (r2,g2,b2); Yg = Y2
+                glyph = HALF_GLYPHS[1]; cr = (r2,g2,b2); Yg = Y2
             else:
-                glyph = ' '; cr = (255,255,255); Yg = 255
+                glyph = HALF_GLYPHS[0]; cr = (255,255,255); Yg = 255
 
-            row.append(paint_cell(glyph, cr[0], cr[1], cr[2], color_mode, Yg) if color else glyph)
-        out.append("".join(row))
-    return "\n".join(out)
+            row.append(glyph); colors.append(cr); lumas.append(Yg)
+        out.append(paint_row(row, colors, lumas, color_mode, color256) if color else b"".join(row))
+    return b"\n".join(out) + b"\n"
+
+
+def _render_half_np(img, lut, color, color_mode, color256, jobs=1):
+    w, h = img.size
+    arr = np.frombuffer(img.buf, np.uint8).reshape(h, w, 4)
+    if h % 2:  # a missing bottom row reads as white
+        arr = np.concatenate([arr, np.full((1, w, 4), 255, np.uint8)])
+    rgb, Y = _pixels_to_luma(arr, lut)
+    top, bot = rgb[0::2], rgb[1::2]
+    Yt, Yb = Y[0::2], Y[1::2]
+    key = (Yt < 128) * 2 + (Yb < 128)
+    if not color:
+        return _join_grid(HALF_GLYPHS, key)
+    both = (top.astype(np.uint16) + bot) // 2
+    k = key[..., None]
+    cr = np.where(k == 3, both, np.where(k == 2, top, np.where(k == 1, bot, 255)))
+    Yg = np.select([key == 3, key == 2, key == 1], [_luma_np(both), Yt, Yb], 255)
+    return _paint_grid(HALF_GLYPHS, key, cr, Yg, color_mode, color256, jobs)
 
 
 BRAILLE_BASE = 0x2800
 BRAILLE_BITS = [(0,0,1),(0,1,2),(0,2,3),(0,3,7),(1,0,4),(1,1,5),(1,2,6),(1,3,8)]
+BRAILLE_GLYPHS = [chr(BRAILLE_BASE + i).encode("utf-8") for i in range(256)]
+
+_BRAILLE_DY = [dy for dx, dy, bit in sorted(BRAILLE_BITS, key=lambda t: t[2])]
+_BRAILLE_DX = [dx for dx, dy, bit in sorted(BRAILLE_BITS, key=lambda t: t[2])]
+
+def _render_braille_np(img, lut, color, color_mode, color256, jobs=1):
+    w, h = img.size
+    ch, cw = (h + 3) // 4, (w + 1) // 2
+    src = np.frombuffer(img.buf, np.uint8).reshape(h, w, 4)
+    exact = h == ch * 4 and w == cw * 2  # always, unless --natural
+    if exact:
+        arr = src
+    else:  # pad to whole cells; dots past the edge don't count
+        arr = np.full((ch * 4, cw * 2, 4), 255, np.uint8)
+        arr[:h, :w] = src
+        valid = np.zeros((ch * 4, cw * 2), bool)
+        valid[:h, :w] = True
+    rgb, Y = _pixels_to_luma(arr, lut)
+    dark = Y < 128
+    if not exact: dark &= valid
+    # gather the 8 dots of every cell in bit order, then pack them LSB first
+    dots = dark.reshape(ch, 4, cw, 2)[:, _BRAILLE_DY, :, _BRAILLE_DX]  # (8, ch, cw)
+    bits = np.packbits(dots, axis=0, bitorder="little")[0]
+    if not color:
+        return _join_grid(BRAILLE_GLYPHS, bits)
+    if exact:
+        avg = rgb.reshape(ch, 4, cw, 2, 3).sum(axis=(1, 3), dtype=np.int64) // 8
+    else:
+        cnt = valid.reshape(ch, 4, cw, 2).sum(axis=(1, 3))[..., None]
+        avg = (rgb * valid[..., None]).reshape(ch, 4, cw, 2, 3).sum(axis=(1, 3)) // cnt
+    return _paint_grid(BRAILLE_GLYPHS, bits, avg, _luma_np(avg), color_mode, color256, jobs)
 
 def render_braille(img, width=None, height=None, gamma=1.0,
-                   color=False, color_mode="auto", natural=False):
-    img, cells_w, cells_h = scale_to_cells(img, "braille", width, height, natural=natural)
+                   color=False, color_mode="auto", natural=False, color256=False, jobs=1,
+                   resample="auto"):
+    img, cells_w, cells_h = scale_to_cells(img, "braille", width, height, natural=natural,
+                                           resample=resample)
+    lut = gamma_lut(gamma)
+    if np is not None:
+        return _render_braille_np(img, lut, color, color_mode, color256, jobs)
     w, h = img.size
     px = img.buf
     out = []
     for cy in range(0, h, 4):
-        row = []
+        row = []; colors = []; lumas = []
         for cx in range(0, w, 2):
             bits = 0
             rs = gs = bs = cnt = 0
@@ -487,20 +1215,16 @@ def render_braille(img, width=None, height=None, gamma=1.0,
                     g = int(ar*g + (1-ar)*255 + 0.5)
                     b = int(ar*b + (1-ar)*255 + 0.5)
                 Y = luma(r,g,b)
-                if gamma != 1.0:
-                    Y = int((Y/255.0) ** gamma * 255 + 0.5)
+                if lut: Y = lut[Y]
                 if Y < 128:
                     bits |= (1 << (bit - 1))
                 rs += r; gs += g; bs += b; cnt += 1
-            glyph = chr(BRAILLE_BASE + bits)
-            if color and cnt:
+            row.append(BRAILLE_GLYPHS[bits])
+            if color:
                 r, g, b = rs//cnt, gs//cnt, bs//cnt
-                Yg = luma(r,g,b)
-                row.append(paint_cell(glyph, r, g, b, color_mode, Yg))
-            else:
-                row.append(glyph)
-        out.append("".join(row))
-    return "\n".join(out)
+                colors.append((r, g, b)); lumas.append(luma(r,g,b))
+        out.append(paint_row(row, colors, lumas, color_mode, color256) if color else b"".join(row))
+    return b"\n".join(out) + b"\n"
 
 
 # ---------------- CLI ----------------
@@ -514,24 +1238,32 @@ def parse_args(argv):
     ap.add_argument("--height", type=int, default=None, help="cells down")
     ap.add_argument("--gamma", type=float, default=1.0, help="tone curve (1.0 = linear)")
     ap.add_argument("--color", action="store_true", help="enable 24-bit ANSI color")
+    ap.add_argument("--color256", action="store_true",
+                    help="use the 256-color palette instead of 24-bit (implies --color)")
     ap.add_argument("--color-mode", choices=["auto","fg","bg"], default="auto",
                     help="color strategy when --color is set (default: auto)")
     ap.add_argument("--char-aspect", type=float, default=None,
                     help="override ASCII/blocks character aspect (default ~0.5)")
     ap.add_argument("--natural", action="store_true",
                     help="render at image's natural cell size for the chosen mode (may be large)")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="forked worker processes for painting very large colored grids (default: 1)")
+    ap.add_argument("--resample", choices=["auto","nearest"], default="auto",
+                    help="downscale filter: auto uses cykooz.resizer or Pillow if installed, "
+                         "else nearest-neighbor (default: auto)")
     return ap.parse_args(argv)
 
 def main():
     a = parse_args(sys.argv[1:])
     img = load_image(a.image)
+    color = a.color or a.color256
     if a.mode == "braille":
-        out = render_braille(img, a.width, a.height, a.gamma, a.color, a.color_mode, a.natural)
+        out = render_braille(img, a.width, a.height, a.gamma, color, a.color_mode, a.natural, a.color256, a.jobs, a.resample)
     elif a.mode == "half":
-        out = render_half(img, a.width, a.height, a.gamma, a.color, a.color_mode, a.natural)
+        out = render_half(img, a.width, a.height, a.gamma, color, a.color_mode, a.natural, a.color256, a.jobs, a.resample)
     else:  # ascii/blocks
-        out = render_blocks(img, a.width, a.height, a.ramp, a.gamma, a.color, a.color_mode, a.char_aspect, a.natural)
-    print(out)
+        out = render_blocks(img, a.width, a.height, a.ramp, a.gamma, color, a.color_mode, a.char_aspect, a.natural, a.color256, a.jobs, a.resample)
+    sys.stdout.buffer.write(out)
 
 if __name__ == "__main__":
     main()